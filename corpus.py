@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Compact in-memory clue corpus with a fast-loading binary snapshot."""
+
+import csv
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, datetime
+
+SNAPSHOT_MAGIC = b"CLUECRP3"
+# Magic, then row, word, clue, raw date text and tags counts as little-endian uint32
+SNAPSHOT_HEADER = struct.Struct("<8sIIIII")
+
+# Deck CSV columns a corpus can hold; Tags is optional
+CSV_COLUMNS = ("Word", "Clue", "Date", "Rank", "Occurrences", "Tags")
+
+# Stored in the rank/occurrences columns for empty or NaN values
+MISSING = -2 ** 31
+
+class _StringTable:
+    """Interned strings, stored as a list or as offsets into a UTF-8 blob"""
+
+    def __init__(self, strings=None):
+        self._strings = list(strings or [])
+        self._ids = None
+        self._offsets = None
+        self._blob = None
+
+    @classmethod
+    def mapped(cls, offsets, blob):
+        """Wrap offsets/blob buffers from a snapshot; strings decode on first use"""
+        table = cls()
+        table._strings = [None] * (len(offsets) - 1)
+        table._offsets = offsets
+        table._blob = blob
+        return table
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __getitem__(self, i):
+        s = self._strings[i]
+        if s is None:
+            s = str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+            self._strings[i] = s
+        return s
+
+    def id_of(self, s):
+        """Return the ID of a string, or None if it isn't in the table"""
+        if self._ids is None:
+            self._ids = {self[i]: i for i in range(len(self))}
+        return self._ids.get(s)
+
+    def intern(self, s):
+        """Return the ID of a string, adding it to the table if needed"""
+        i = self.id_of(s)
+        if i is None:
+            i = len(self._strings)
+            self._strings.append(s)
+            self._ids[s] = i
+        return i
+
+    def to_bytes(self):
+        """Return (offsets, blob) for writing to a snapshot"""
+        offsets = array("I", [0])
+        chunks = []
+        for i in range(len(self)):
+            chunk = self[i].encode("utf-8")
+            chunks.append(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+        return offsets, b"".join(chunks)
+
+def parse_clue_date(text):
+    """Convert a date like "Tue Oct 14, 2025" to a day ordinal (0 if undated)"""
+    try:
+        return datetime.strptime(text, "%a %b %d, %Y").toordinal()
+    except ValueError:
+        return 0
+
+def _to_int(value):
+    """Convert a Rank/Occurrences value to int, or MISSING if it is empty or NaN"""
+    if value is None:
+        return MISSING
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return MISSING
+    number = float(value)
+    if number != number:  # NaN, e.g. an empty cell read by pandas
+        return MISSING
+    return int(number)
+
+def format_clue_date(ordinal):
+    """Convert a day ordinal back to the "Tue Oct 14, 2025" format ("-" if undated)"""
+    if not ordinal:
+        return "-"
+    d = date.fromordinal(ordinal)
+    return f"{d:%a %b} {d.day}, {d.year}"
+
+class ClueCorpus:
+    """
+    Column-oriented store of (Word, Clue, Date, Rank, Occurrences, Tags) rows
+
+    Words, clues and tags are interned into string tables, and each row is six
+    integers: word ID, clue ID, date, rank, occurrences and tags ID. That costs
+    24 bytes per row plus one copy of each distinct string, instead of a dict
+    of Python objects per row.
+
+    A date is stored as its day ordinal, 0 for "-", or -(id + 1) into the
+    date_texts table for text that isn't a "Tue Oct 14, 2025" style date, so
+    every date is written back exactly as it was read. Empty or NaN ranks and
+    occurrences are stored as MISSING and returned as None. Tags are stored
+    as id + 1 into the tags table, or 0 for rows added without a Tags column
+    (their row() has no "Tags" key, like the CSVs nytwords.py writes).
+
+    A corpus can be saved to a binary snapshot and loaded back with load(),
+    which memory-maps the file so the columns are used in place without
+    parsing.
+    """
+
+    def __init__(self):
+        self.words = _StringTable()
+        self.clues = _StringTable()
+        self.date_texts = _StringTable()
+        self.tags = _StringTable()
+        self.word_ids = array("I")
+        self.clue_ids = array("I")
+        self.dates = array("i")
+        self.ranks = array("i")
+        self.occurrences = array("i")
+        self.tag_ids = array("I")
+        self._word_index = None
+        self._date_codes = {}
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.word_ids)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    def append(self, word, clue, date_text, rank, occurrences, tags=None):
+        """
+        Add a row to the corpus
+
+        Args:
+            word: Answer word
+            clue: Clue text
+            date_text: Date as shown on xwordinfo.com (e.g. "Tue Oct 14, 2025") or "-"
+            rank: Popularity rank of the word
+            occurrences: Number of times the word appears in NYT crosswords
+            tags: Optional "|"-separated tags (e.g. "names|foreign"); None if the
+                source has no Tags column
+        """
+        if self._mmap is not None:
+            self._unmap()
+
+        if not isinstance(date_text, str):
+            # None or NaN (an empty cell read by pandas) is kept as an empty date
+            date_text = "" if date_text is None or date_text != date_text else str(date_text)
+        code = self._date_codes.get(date_text)
+        if code is None:
+            # Dates repeat heavily, so encode each distinct one once
+            code = self._encode_date(date_text)
+            self._date_codes[date_text] = code
+
+        word_id = self.words.intern(word)
+        self.word_ids.append(word_id)
+        self.clue_ids.append(self.clues.intern(clue))
+        self.dates.append(code)
+        self.ranks.append(_to_int(rank))
+        self.occurrences.append(_to_int(occurrences))
+        self.tag_ids.append(0 if tags is None else self.tags.intern(tags) + 1)
+        if self._word_index is not None:
+            self._word_index.setdefault(word_id, []).append(len(self) - 1)
+
+    def _encode_date(self, date_text):
+        """Return the dates column value for a date string"""
+        if date_text == "-":
+            return 0
+        ordinal = parse_clue_date(date_text)
+        # Only store the ordinal if it formats back to exactly the same text
+        if ordinal and format_clue_date(ordinal) == date_text:
+            return ordinal
+        return -(self.date_texts.intern(date_text) + 1)
+
+    def date_text(self, i):
+        """Return the Date of row i exactly as it was added"""
+        code = self.dates[i]
+        if code < 0:
+            return self.date_texts[-code - 1]
+        return format_clue_date(code)
+
+    def row(self, i):
+        """Return row i as a dict with the same keys as the deck CSV columns"""
+        rank = self.ranks[i]
+        occurrences = self.occurrences[i]
+        row = {
+            "Word": self.words[self.word_ids[i]],
+            "Clue": self.clues[self.clue_ids[i]],
+            "Date": self.date_text(i),
+            "Rank": None if rank == MISSING else rank,
+            "Occurrences": None if occurrences == MISSING else occurrences
+        }
+        if self.tag_ids[i]:
+            row["Tags"] = self.tags[self.tag_ids[i] - 1]
+        return row
+
+    def to_records(self):
+        """Return every row as a list of dicts (e.g. for pd.DataFrame)"""
+        return [self.row(i) for i in range(len(self))]
+
+    def rows_for_word(self, word):
+        """Return the indices of every row whose answer is `word`"""
+        word_id = self.words.id_of(word)
+        if word_id is None:
+            return []
+        if self._word_index is None:
+            index = {}
+            for i, wid in enumerate(self.word_ids):
+                index.setdefault(wid, []).append(i)
+            self._word_index = index
+        return list(self._word_index.get(word_id, []))
+
+    def rows_with_tag(self, tag):
+        """Return the indices of every row tagged `tag` (e.g. "names")"""
+        tag_codes = {i + 1 for i in range(len(self.tags)) if tag in self.tags[i].split("|")}
+        return [i for i, code in enumerate(self.tag_ids) if code in tag_codes]
+
+    def rows_with_rank(self, max_rank, min_rank=1):
+        """Return the indices of every row with min_rank <= Rank <= max_rank (missing ranks never match)"""
+        return [i for i, rank in enumerate(self.ranks) if min_rank <= rank <= max_rank]
+
+    @classmethod
+    def from_csv(cls, csv_file):
+        """
+        Load a corpus from a deck CSV with Word, Clue, Date, Rank, Occurrences
+        and optionally Tags columns
+
+        Args:
+            csv_file: Path to the CSV file (e.g. "output.csv")
+
+        Returns:
+            ClueCorpus with one row per CSV row
+
+        Raises:
+            ValueError: If the CSV has columns the corpus can't store
+        """
+        corpus = cls()
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            # Refuse rather than silently drop data the snapshot couldn't hold
+            extra = [column for column in reader.fieldnames or [] if column not in CSV_COLUMNS]
+            if extra:
+                raise ValueError(f"{csv_file} has unsupported columns: {', '.join(extra)}")
+            for record in reader:
+                corpus.append(record["Word"], record["Clue"], record["Date"],
+                              record["Rank"], record["Occurrences"], record.get("Tags"))
+        return corpus
+
+    def save(self, snapshot_file):
+        """
+        Write the corpus to a binary snapshot
+
+        Layout: header, word/clue/date text/tags offsets, the six integer
+        columns, then the UTF-8 word, clue, date text and tags blobs. Everything is little-endian and
+        4-byte aligned so load() can use the columns straight from the file.
+
+        Args:
+            snapshot_file: Output path (e.g. "output.corpus")
+        """
+        if sys.byteorder != "little":
+            # Columns are written in native byte order so load() can map them directly
+            raise ValueError("Corpus snapshots can only be written on little-endian machines")
+
+        word_offsets, word_blob = self.words.to_bytes()
+        clue_offsets, clue_blob = self.clues.to_bytes()
+        date_offsets, date_blob = self.date_texts.to_bytes()
+        tag_offsets, tag_blob = self.tags.to_bytes()
+        sections = [word_offsets, clue_offsets, date_offsets, tag_offsets, self.word_ids,
+                    self.clue_ids, self.dates, self.ranks, self.occurrences, self.tag_ids]
+
+        with open(snapshot_file, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(self), len(self.words),
+                                         len(self.clues), len(self.date_texts), len(self.tags)))
+            for section in sections:
+                f.write(bytes(section))
+            f.write(word_blob)
+            f.write(clue_blob)
+            f.write(date_blob)
+            f.write(tag_blob)
+
+    @classmethod
+    def load(cls, snapshot_file):
+        """
+        Load a corpus from a binary snapshot written by save()
+
+        The file is memory-mapped: integer columns are read in place and
+        strings are decoded only when first accessed, so loading takes
+        milliseconds regardless of corpus size.
+
+        Args:
+            snapshot_file: Path to the snapshot
+
+        Returns:
+            ClueCorpus backed by the mapped file
+        """
+        if sys.byteorder != "little":
+            # Mapped columns can't be byte-swapped in place
+            raise ValueError("Corpus snapshots can only be memory-mapped on little-endian machines")
+
+        with open(snapshot_file, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < SNAPSHOT_HEADER.size:
+            raise ValueError(f"{snapshot_file} is not a clue corpus snapshot")
+        magic, n_rows, n_words, n_clues, n_date_texts, n_tags = SNAPSHOT_HEADER.unpack_from(mm)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{snapshot_file} is not a clue corpus snapshot")
+
+        view = memoryview(mm)
+        pos = SNAPSHOT_HEADER.size
+
+        def take(count, typecode):
+            nonlocal pos
+            section = view[pos:pos + count * 4].cast(typecode)
+            pos += count * 4
+            return section
+
+        word_offsets = take(n_words + 1, "I")
+        clue_offsets = take(n_clues + 1, "I")
+        date_offsets = take(n_date_texts + 1, "I")
+        tag_offsets = take(n_tags + 1, "I")
+
+        corpus = cls()
+        corpus.word_ids = take(n_rows, "I")
+        corpus.clue_ids = take(n_rows, "I")
+        corpus.dates = take(n_rows, "i")
+        corpus.ranks = take(n_rows, "i")
+        corpus.occurrences = take(n_rows, "i")
+        corpus.tag_ids = take(n_rows, "I")
+
+        word_blob = view[pos:pos + word_offsets[n_words]]
+        pos += word_offsets[n_words]
+        clue_blob = view[pos:pos + clue_offsets[n_clues]]
+        pos += clue_offsets[n_clues]
+        date_blob = view[pos:pos + date_offsets[n_date_texts]]
+        pos += date_offsets[n_date_texts]
+        tag_blob = view[pos:pos + tag_offsets[n_tags]]
+        corpus.words = _StringTable.mapped(word_offsets, word_blob)
+        corpus.clues = _StringTable.mapped(clue_offsets, clue_blob)
+        corpus.date_texts = _StringTable.mapped(date_offsets, date_blob)
+        corpus.tags = _StringTable.mapped(tag_offsets, tag_blob)
+        corpus._mmap = mm
+        return corpus
+
+    def _unmap(self):
+        """Copy mapped columns into arrays so the corpus can grow"""
+        self.words = _StringTable(self.words[i] for i in range(len(self.words)))
+        self.clues = _StringTable(self.clues[i] for i in range(len(self.clues)))
+        self.date_texts = _StringTable(self.date_texts[i] for i in range(len(self.date_texts)))
+        self.tags = _StringTable(self.tags[i] for i in range(len(self.tags)))
+        for name in ("word_ids", "clue_ids", "dates", "ranks", "occurrences", "tag_ids"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.format, column))
+        self._mmap = None
+
+if __name__ == "__main__":
+    # Usage: python3 corpus.py [input.csv] [snapshot]
+    csv_file = sys.argv[1] if len(sys.argv) > 1 else "output.csv"
+    snapshot_file = sys.argv[2] if len(sys.argv) > 2 else csv_file.rsplit(".", 1)[0] + ".corpus"
+    corpus = ClueCorpus.from_csv(csv_file)
+    corpus.save(snapshot_file)
+    print(f"Saved {len(corpus)} clues ({len(corpus.words)} words, {len(corpus.clues)} distinct clues) to {snapshot_file}")
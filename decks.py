@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Build helpers for the flashcard decks served by serve.py."""
+
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+
+DECK_MANIFEST = "decks.json"
+DECK_VERSIONS_DIR = ".decks"
+
+# Versions kept per deck; clients further behind get a full snapshot
+MAX_HISTORY = 30
+# Send a snapshot instead when a patch would touch more than this share of the deck
+MAX_PATCH_FRACTION = 0.5
+
+# Held while a deck's version files change, so readers never see a half-built version
+_versions_lock = threading.RLock()
+
+def find_deck_files(root="."):
+    """
+    Find every deck CSV the flashcards app can load
+
+    Args:
+        root: Directory containing output.csv and the study/ folder
+
+    Returns:
+        List of deck paths relative to root, using forward slashes
+    """
+    decks = []
+    if os.path.exists(os.path.join(root, "output.csv")):
+        decks.append("output.csv")
+    for path in sorted(glob.glob(os.path.join(root, "study", "*.csv"))):
+        decks.append("study/" + os.path.basename(path))
+    return decks
+
+def content_version(content):
+    """Return the version ID of a deck: a short hash of its file contents"""
+    return hashlib.sha256(content).hexdigest()[:12]
+
+def parse_deck(content):
+    """
+    Parse deck CSV bytes into a header and data rows
+
+    Args:
+        content: Raw bytes of the deck CSV
+
+    Returns:
+        Tuple (columns, rows) where rows is a list of lists of strings
+    """
+    # Use the csv module since clues can contain commas, quotes and newlines
+    rows = list(csv.reader(io.StringIO(content.decode("utf-8"), newline="")))
+    if not rows:
+        return [], []
+    return rows[0], [row for row in rows[1:] if row]
+
+def card_ids(rows):
+    """
+    Assign stable IDs to deck rows
+
+    A card's ID depends only on its Word, Clue and Date, so it stays the same
+    when other rows are added, removed or reordered. Exact duplicate rows get
+    a counter suffix to keep IDs unique.
+
+    Args:
+        rows: Data rows as returned by parse_deck
+
+    Returns:
+        List of card IDs, one per row
+    """
+    ids = []
+    seen = {}
+    for row in rows:
+        key = "\x1f".join(row[:3])
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        if n:
+            key = f"{key}\x1f{n}"
+        ids.append(hashlib.sha1(key.encode("utf-8")).hexdigest()[:12])
+    return ids
+
+def _deck_dir(deck, root=".", versions_dir=DECK_VERSIONS_DIR):
+    """Return the directory holding a deck's version history"""
+    return os.path.join(root, versions_dir, deck.replace("/", "__"))
+
+def _file_stat(path):
+    """Return [mtime, size] of a file, as recorded in a deck's history.json"""
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def _write_json(path, data, indent=None):
+    # Write to a temporary file and rename it into place, so a reader (or a
+    # crash) never sees a partially written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent, separators=None if indent else (",", ":"))
+    os.replace(tmp_path, path)
+
+def build_deck_version(deck, root=".", versions_dir=DECK_VERSIONS_DIR):
+    """
+    Record the current contents of a deck as a new version if it changed
+
+    Writes a snapshot of the new version and a row-level patch from the
+    previous version to <versions_dir>/<deck>/. Only the latest snapshot is
+    kept; older versions are reachable through their patches.
+
+    Args:
+        deck: Deck path relative to root (e.g. "study/names.csv")
+        root: Directory containing the deck files
+        versions_dir: Directory for version history, relative to root
+
+    Returns:
+        The deck's current version ID
+    """
+    with _versions_lock:
+        path = os.path.join(root, deck)
+        stat = _file_stat(path)
+        with open(path, "rb") as f:
+            content = f.read()
+        version = content_version(content)
+
+        deck_dir = _deck_dir(deck, root, versions_dir)
+        history_file = os.path.join(deck_dir, "history.json")
+        recorded = _read_json(history_file) if os.path.exists(history_file) else {}
+        history = recorded.get("versions", [])
+        if history and history[-1] == version:
+            if recorded.get("stat") != stat:
+                # Touched but not changed: remember the new stat so it isn't re-hashed
+                _write_json(history_file, {**recorded, "stat": stat})
+            return version
+
+        columns, rows = parse_deck(content)
+        snapshot = {"version": version, "columns": columns, "cards": dict(zip(card_ids(rows), rows))}
+
+        os.makedirs(deck_dir, exist_ok=True)
+        previous = history[-1] if history else None
+        previous_file = os.path.join(deck_dir, f"{previous}.json")
+        if previous and os.path.exists(previous_file):
+            old = _read_json(previous_file)
+            if old["columns"] == columns:
+                old_cards = old["cards"]
+                new_cards = snapshot["cards"]
+                _write_json(os.path.join(deck_dir, f"{previous}_{version}.json"), {
+                    "from": previous,
+                    "to": version,
+                    "upserts": {cid: row for cid, row in new_cards.items() if old_cards.get(cid) != row},
+                    "deletes": [cid for cid in old_cards if cid not in new_cards]
+                })
+            else:
+                # Rows can't be patched across a header change, so start a fresh
+                # history and drop the patches that belonged to the old one
+                history = []
+                for name in os.listdir(deck_dir):
+                    if "_" in name and name.endswith(".json"):
+                        os.remove(os.path.join(deck_dir, name))
+            os.remove(previous_file)
+
+        _write_json(os.path.join(deck_dir, f"{version}.json"), snapshot)
+        history.append(version)
+
+        # Forget versions (and their patches) beyond MAX_HISTORY
+        while len(history) > MAX_HISTORY:
+            patch_file = os.path.join(deck_dir, f"{history[0]}_{history[1]}.json")
+            if os.path.exists(patch_file):
+                os.remove(patch_file)
+            history.pop(0)
+
+        _write_json(history_file, {"versions": history, "cards": len(rows), "stat": stat})
+        print(f"{deck}: version {version} ({len(rows)} cards)")
+        return version
+
+def build_deck_versions(root=".", versions_dir=DECK_VERSIONS_DIR):
+    """
+    Record new versions for every deck that changed since the last build
+
+    Args:
+        root: Directory containing the deck files
+        versions_dir: Directory for version history, relative to root
+
+    Returns:
+        Dictionary mapping deck path to its current version ID
+    """
+    versions = {}
+    for deck in find_deck_files(root):
+        versions[deck] = build_deck_version(deck, root, versions_dir)
+
+    # Drop history for decks that no longer exist
+    known = {os.path.basename(_deck_dir(deck, root, versions_dir)) for deck in versions}
+    base = os.path.join(root, versions_dir)
+    with _versions_lock:
+        for name in os.listdir(base) if os.path.isdir(base) else []:
+            if name not in known:
+                shutil.rmtree(os.path.join(base, name))
+
+    return versions
+
+def changes_since(deck, since=None, root=".", versions_dir=DECK_VERSIONS_DIR):
+    """
+    Get what a client holding version `since` of a deck needs to catch up
+
+    Args:
+        deck: Deck path relative to root
+        since: Version ID the client has, or None if it has nothing
+        root: Directory containing the deck files
+        versions_dir: Directory for version history, relative to root
+
+    Returns:
+        One of:
+        - {"type": "current", "version": ...} if the client is up to date
+        - {"type": "patch", "from": ..., "version": ..., "upserts": {id: row}, "deletes": [id]}
+        - {"type": "snapshot", "version": ..., "columns": [...], "cards": {id: row}}
+          if `since` is unknown or the patch would be too large
+
+    Raises:
+        FileNotFoundError: If the deck file doesn't exist
+    """
+    with _versions_lock:
+        deck_dir = _deck_dir(deck, root, versions_dir)
+        history_file = os.path.join(deck_dir, "history.json")
+        stat = _file_stat(os.path.join(root, deck))
+        recorded = _read_json(history_file) if os.path.exists(history_file) else {}
+        if recorded.get("stat") != stat:
+            # A deck added or edited since the last build (e.g. without --watch):
+            # version it now so clients never get a stale copy
+            build_deck_version(deck, root, versions_dir)
+            if recorded.get("versions", [None])[-1] != _read_json(history_file)["versions"][-1]:
+                write_deck_manifest(root, changed={deck}, versions_dir=versions_dir)
+        history = _read_json(history_file)["versions"]
+        latest = history[-1]
+
+        if since == latest:
+            return {"type": "current", "version": latest}
+
+        snapshot = _read_json(os.path.join(deck_dir, f"{latest}.json"))
+        if since in history:
+            # Fold the patches in order from the last time the client's version was
+            # current; later changes to a card win
+            start = len(history) - 1 - history[::-1].index(since)
+            changes = {}
+            for old, new in zip(history[start:], history[start + 1:]):
+                patch_file = os.path.join(deck_dir, f"{old}_{new}.json")
+                if not os.path.exists(patch_file):
+                    changes = None
+                    break
+                patch = _read_json(patch_file)
+                changes.update(patch["upserts"])
+                changes.update(dict.fromkeys(patch["deletes"]))
+            if changes is not None and len(changes) <= MAX_PATCH_FRACTION * max(len(snapshot["cards"]), 1):
+                return {
+                    "type": "patch",
+                    "from": since,
+                    "version": latest,
+                    "upserts": {cid: row for cid, row in changes.items() if row is not None},
+                    "deletes": [cid for cid, row in changes.items() if row is None]
+                }
+
+        return {"type": "snapshot", **snapshot}
+
+def remove_deck_versions(deck, root=".", versions_dir=DECK_VERSIONS_DIR):
+    """
+    Delete the version history of a deck that no longer exists
+
+    Args:
+        deck: Deck path relative to root
+        root: Directory containing the deck files
+        versions_dir: Directory for version history, relative to root
+    """
+    with _versions_lock:
+        deck_dir = _deck_dir(deck, root, versions_dir)
+        if os.path.isdir(deck_dir):
+            shutil.rmtree(deck_dir)
+
+def _manifest_entry(deck, root=".", versions_dir=DECK_VERSIONS_DIR):
+    """Return a deck's manifest entry from its recorded version, without re-reading the CSV"""
+    deck_dir = _deck_dir(deck, root, versions_dir)
+    history_file = os.path.join(deck_dir, "history.json")
+    if not os.path.exists(history_file):
+        build_deck_version(deck, root, versions_dir)
+    history = _read_json(history_file)
+    version = history["versions"][-1]
+    cards = history.get("cards")
+    if cards is None:
+        # History written before card counts were recorded
+        cards = len(_read_json(os.path.join(deck_dir, f"{version}.json"))["cards"])
+    return {"file": deck, "cards": cards, "version": version}
+
+def write_deck_manifest(root=".", manifest_file=DECK_MANIFEST, changed=None, versions_dir=DECK_VERSIONS_DIR):
+    """
+    Write the deck manifest the service worker uses to precache decks
+
+    Entries come from each deck's recorded version, so the manifest always
+    matches what /sync serves.
+
+    Args:
+        root: Directory containing the deck files
+        manifest_file: Manifest filename, relative to root
+        changed: Decks whose entries need refreshing; other entries are reused
+            from the existing manifest. None rebuilds every entry.
+        versions_dir: Directory for version history, relative to root
+
+    Returns:
+        The manifest dictionary that was written
+    """
+    with _versions_lock:
+        manifest_path = os.path.join(root, manifest_file)
+        existing = {}
+        if changed is not None and os.path.exists(manifest_path):
+            existing = {entry["file"]: entry for entry in _read_json(manifest_path)["decks"]}
+
+        decks = []
+        for deck in find_deck_files(root):
+            if deck in existing and deck not in changed:
+                decks.append(existing[deck])
+            elif changed is None or not existing or deck in changed:
+                decks.append(_manifest_entry(deck, root, versions_dir))
+            # Otherwise the deck is new and not yet built; it's added once it is
+
+        manifest = {"decks": decks}
+        _write_json(manifest_path, manifest, indent=2)
+
+    print(f"Wrote {len(decks)} decks to {manifest_file}")
+    return manifest
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.abspath(__file__))
+    build_deck_versions(root)
+    write_deck_manifest(root)
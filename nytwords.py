@@ -3,6 +3,8 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import time
 
+from corpus import ClueCorpus
+
 def create_session():
     """Create and authenticate a session for xwordinfo.com"""
     session = requests.Session()
@@ -612,8 +614,10 @@ def process_wordlist_csv(csv_file="wordlist.csv", output_file="output.csv"):
 
     Args:
         csv_file: Input CSV file with Word,Clues,Occurrences,Rank columns
-        output_file: Output CSV file
+        output_file: Output CSV file (a ClueCorpus snapshot is saved next to it as .corpus)
     """
+    import os
+
     # Load wordlist
     try:
         wordlist_df = pd.read_csv(csv_file)
@@ -626,7 +630,8 @@ def process_wordlist_csv(csv_file="wordlist.csv", output_file="output.csv"):
     session = create_session()
     print("Establishing session...")
 
-    all_results = []
+    # Collect clues in a compact interned corpus rather than a dict per row
+    corpus = ClueCorpus()
 
     for index, row in wordlist_df.iterrows():
         word = row["Word"]
@@ -706,22 +711,18 @@ def process_wordlist_csv(csv_file="wordlist.csv", output_file="output.csv"):
                     # Remove suffix counts like "(19)", "(6)", etc. from clues
                     import re
                     clue = re.sub(r'\(\d+\)$', '', clue).strip()
-                    all_results.append({
-                        "Word": word,
-                        "Clue": clue,
-                        "Date": date,
-                        "Rank": rank,
-                        "Occurrences": occurrences
-                    })
+                    corpus.append(word, clue, date, rank, occurrences)
                     clues_found += 1
             print(f"  Found {clues_found} clues")
         else:
             print(f"  Could not find clues table for '{word}'")
 
-    # Save all results
-    df = pd.DataFrame(all_results)
+    # Save all results, plus a binary snapshot that tools can load in milliseconds
+    df = pd.DataFrame(corpus.to_records())
     df.to_csv(output_file, index=False)
-    print(f"\nSaved {len(all_results)} total clues to {output_file}")
+    snapshot_file = os.path.splitext(output_file)[0] + ".corpus"
+    corpus.save(snapshot_file)
+    print(f"\nSaved {len(corpus)} total clues to {output_file} (snapshot: {snapshot_file})")
     return df
 
 # Main execution
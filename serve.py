@@ -2,19 +2,62 @@
 """Simple HTTP server to serve the flashcards application."""
 
 import http.server
+import json
 import socketserver
+import sys
+import threading
+import time
 import webbrowser
 import os
+from urllib.parse import urlparse, parse_qs
+
+from decks import (build_deck_version, build_deck_versions, changes_since, find_deck_files,
+                   remove_deck_versions, write_deck_manifest)
 
 PORT = 8080
+WATCH_INTERVAL = 0.5  # Seconds between deck file checks in --watch mode
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         # Add CORS headers to allow local file access
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        # Always revalidate (cheap 304s via Last-Modified); the service worker handles offline use
+        self.send_header('Cache-Control', 'no-cache, must-revalidate')
         super().end_headers()
 
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/sync':
+            self.send_deck_changes(parse_qs(url.query))
+        else:
+            super().do_GET()
+
+    def send_deck_changes(self, query):
+        """Answer /sync?deck=<file>&since=<version> with a patch or a full snapshot"""
+        deck = query.get('deck', [''])[0]
+        since = query.get('since', [None])[0]
+        if deck not in find_deck_files():
+            self.send_error(404, f"Unknown deck: {deck}")
+            return
+
+        try:
+            changes = changes_since(deck, since)
+        except FileNotFoundError:
+            # The deck was removed after the check above
+            self.send_error(404, f"Unknown deck: {deck}")
+            return
+        except ValueError as e:
+            # e.g. a half-written CSV that isn't valid UTF-8 yet
+            self.send_error(503, f"Deck {deck} could not be built: {e}")
+            return
+
+        body = json.dumps(changes, separators=(',', ':')).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
 def find_available_port(start_port=8080, max_attempts=10):
     """Find an available port starting from start_port."""
     for port in range(start_port, start_port + max_attempts):
@@ -27,9 +70,71 @@ def find_available_port(start_port=8080, max_attempts=10):
             continue
     raise OSError(f"Could not find available port in range {start_port}-{start_port + max_attempts}")
 
-def main():
+def deck_file_stats():
+    """Return {deck: (mtime, size)} for every deck file currently on disk."""
+    stats = {}
+    for deck in find_deck_files():
+        try:
+            st = os.stat(deck)
+        except FileNotFoundError:
+            continue
+        stats[deck] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+def watch_decks(built, interval=WATCH_INTERVAL):
+    """
+    Poll deck files and rebuild the versions and manifest of any that change.
+
+    `built` is the {deck: (mtime, size)} state the last full build saw; it must
+    be taken before that build so edits made during it are still picked up.
+    """
+    built = dict(built)
+    last = built
+    while True:
+        time.sleep(interval)
+        current = deck_file_stats()
+
+        # Only rebuild a deck once its file has stopped changing for one interval,
+        # so a CSV that is still being written is never picked up half-finished
+        changed = [deck for deck, stat in current.items() if stat != built.get(deck) and stat == last.get(deck)]
+        removed = [deck for deck in built if deck not in current]
+        last = current
+        if not changed and not removed:
+            continue
+
+        start = time.perf_counter()
+        try:
+            for deck in removed:
+                del built[deck]
+                remove_deck_versions(deck)
+            for deck in changed:
+                built[deck] = current[deck]
+                build_deck_version(deck)
+            # Only the changed decks' manifest entries are rebuilt
+            write_deck_manifest(changed=set(changed + removed))
+        except Exception as e:
+            # Keep serving the last good version; the deck is retried when it changes again
+            print(f"Error rebuilding decks: {e}")
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {', '.join(changed + removed)} in {elapsed:.1f} ms")
+
+def main(watch=False):
     # Change to the directory containing this script
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # Version any decks that changed, then list them so the service worker can precache them
+    # Snapshot file stats before building, so the watcher catches anything
+    # written while the build runs
+    stats = deck_file_stats()
+    start = time.perf_counter()
+    build_deck_versions()
+    write_deck_manifest()
+    print(f"Built decks in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if watch:
+        threading.Thread(target=watch_decks, args=(stats,), daemon=True).start()
+        print("Watching deck files for changes")
     
     Handler = MyHTTPRequestHandler
     
@@ -59,4 +164,4 @@ def main():
             print("\nServer stopped.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(watch="--watch" in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,97 @@
+// Service worker: precaches the app shell and decks so practice works offline,
+// then serves everything stale-while-revalidate.
+
+const CACHE_NAME = 'flashcards-v1';
+const DECK_MANIFEST = 'decks.json';
+const APP_SHELL = ['./', 'index.html', 'favicon.svg', DECK_MANIFEST];
+// Cache key recording which manifest version of each deck is cached: { file: version }
+const DECK_VERSIONS_KEY = 'deck-versions.json';
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => Promise.all(APP_SHELL.map(url => cache.add(url).catch(() => null)))
+                .then(() => precacheDecks(cache)))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+    // Deck sync answers depend on what the client already has, so never serve them from cache
+    if (url.pathname.endsWith('/sync')) return;
+
+    event.respondWith(caches.open(CACHE_NAME).then(async cache => {
+        // Ignore "?seed=..." and similar when matching the page itself
+        const cached = await cache.match(request, { ignoreSearch: request.mode === 'navigate' });
+
+        const revalidate = fetch(request).then(response => {
+            if (response.ok) {
+                cache.put(request, response.clone());
+                // A new manifest may list decks we have not cached yet
+                if (url.pathname.endsWith('/' + DECK_MANIFEST)) {
+                    return precacheDecks(cache, response.clone()).then(() => response);
+                }
+            }
+            return response;
+        });
+
+        // The page never requests the manifest itself, so check it on each visit
+        // to pick up decks that changed since they were cached
+        if (request.mode === 'navigate') {
+            event.waitUntil(refreshDecks(cache));
+        }
+
+        if (cached) {
+            event.waitUntil(revalidate.catch(() => null));
+            return cached;
+        }
+        return revalidate;
+    }));
+});
+
+async function refreshDecks(cache) {
+    try {
+        const response = await fetch(DECK_MANIFEST);
+        if (!response.ok) return;
+        await cache.put(DECK_MANIFEST, response.clone());
+        await precacheDecks(cache, response);
+    } catch (error) {
+        // Offline: keep the decks we have
+    }
+}
+
+async function precacheDecks(cache, manifestResponse) {
+    try {
+        const response = manifestResponse || await cache.match(DECK_MANIFEST) || await fetch(DECK_MANIFEST);
+        const manifest = await response.json();
+        const versionsResponse = await cache.match(DECK_VERSIONS_KEY);
+        const cachedVersions = versionsResponse ? await versionsResponse.json() : {};
+
+        // Re-fetch decks that are missing or whose version changed since they were cached
+        const versions = {};
+        await Promise.all(manifest.decks.map(async deck => {
+            if (cachedVersions[deck.file] !== deck.version || !await cache.match(deck.file)) {
+                await cache.add(new Request(deck.file, { cache: 'no-cache' }));
+            }
+            versions[deck.file] = deck.version;
+        }));
+
+        await cache.put(DECK_VERSIONS_KEY, new Response(JSON.stringify(versions), {
+            headers: { 'Content-Type': 'application/json' }
+        }));
+    } catch (error) {
+        // No manifest (e.g. index.html opened without serve.py): the shell still works offline
+        console.warn('Could not precache decks:', error);
+    }
+}